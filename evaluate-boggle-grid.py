@@ -30,23 +30,116 @@ Scoring system (standard Boggle):
 - 6 letters: 3 points
 - 7 letters: 5 points
 - 8+ letters: 11 points
+
+The Q die face counts as "Qu" (two letters towards the word length)
 """
 
-import argparse, random, itertools
+import argparse, heapq, multiprocessing, multiprocessing.pool, os, random, itertools, sys
+from array import array
 from collections import defaultdict, deque
 from typing import List, Set, Tuple, Dict
 
+""" ----------- search ----------- """
+def find_word_nodes(grid_bytes: bytes, child_index: array, child_mask: array, term_score: array,
+                    neighbors_flat: Tuple[Tuple[int, ...], ...], seen_gen: array, grid_id: int) -> List[int]:
+    """Find the terminal trie nodes of every word in the grid
+
+    Works purely on the flat grid/trie/neighbour tables (no evaluator state), each cell may only be used once
+    per path (bit n of used marks cell n). A word is only reported once per grid: seen_gen[node] is stamped
+    with grid_id when it is found, so grid_id must be new for every call sharing the same seen_gen
+    """
+    found_nodes = []
+
+    # Explicit stack of (cell, trie node, used mask) paths, seeded with every starting position
+    # (single letters are never scorable words)
+    stack = []
+    for cell, letter in enumerate(grid_bytes):
+        node = child_index[letter]
+        if node >= 0:
+            stack.append((cell, node, 1 << cell))
+
+    push, pop = stack.append, stack.pop
+    while stack:
+        cell, node, used = pop()
+        neighbors = neighbors_flat[cell]
+
+        # Letters on the unused neighbours, only those the trie node has children for are worth exploring
+        avail_letters = 0
+        for n in neighbors:
+            if not (used >> n) & 1:
+                avail_letters |= 1 << grid_bytes[n]
+        mask = child_mask[node] & avail_letters
+
+        # Pop the letters off the mask one bit at a time
+        base = node * 26
+        while mask:
+            low = mask & -mask
+            mask ^= low
+            letter = low.bit_length() - 1
+            nxt = child_index[base + letter]
+            if term_score[nxt] and seen_gen[nxt] != grid_id:
+                seen_gen[nxt] = grid_id
+                found_nodes.append(nxt)
+            for n in neighbors:
+                if grid_bytes[n] == letter and not (used >> n) & 1:
+                    push((n, nxt, used | (1 << n)))
+
+    return found_nodes
+
+# Search tables of a pool worker, set once per process by init_search_worker,
+# along with the worker's own found-word stamps and the id of the last grid it scored
+_worker_tables = None
+_worker_seen_gen = None
+_worker_grid_id = 0
+
+def init_search_worker(child_index: array, child_mask: array, term_score: array,
+                       neighbors_flat: Tuple[Tuple[int, ...], ...]) -> None:
+    """Pool initializer, keeps the trie and neighbour tables in the worker process"""
+    global _worker_tables, _worker_seen_gen
+    _worker_tables = (child_index, child_mask, term_score, neighbors_flat)
+    _worker_seen_gen = array('I', [0]) * len(term_score)
+
+def score_grid(grid_bytes: bytes) -> int:
+    """Score an encoded grid inside a pool worker"""
+    global _worker_grid_id
+    _worker_grid_id += 1
+    term_score = _worker_tables[2]
+    return sum(term_score[node] for node in find_word_nodes(grid_bytes, *_worker_tables, _worker_seen_gen, _worker_grid_id))
+
+def score_grids(grids_bytes: bytes) -> array:
+    """Score a batch of encoded grids packed back to back inside a pool worker"""
+    cells = len(_worker_tables[3])
+    return array('i', (score_grid(grids_bytes[i:i + cells]) for i in range(0, len(grids_bytes), cells)))
+
+class Individual:
+    """A grid of the GA population with its dice, dirty until its score has been calculated"""
+    __slots__ = ('grid', 'dice', 'score', 'dirty')
+
+    def __init__(self, grid: bytes, dice: List[bytes]):
+        self.grid = grid
+        self.dice = dice
+        self.score = 0
+        self.dirty = True
+
 class BoggleEvaluator:
     def __init__(self, word_list: List[str], arg_size: str, verbose: bool = False):
         self.size = 5 if arg_size == 'big' else 4
         self.verbose = verbose
-        self.word_set = set(word_list)
-        self.word_trie = self.make_trie(word_list)
+
+        # Scores of recently evaluated grids keyed by their encoded bytes, oldest entries are evicted first
+        self._score_cache: Dict[bytes, int] = {}
+        self._score_cache_limit = 200
         
         # Standard Boggle scoring (words must be 3+ letters, 8+ letters score 11 points)
         self.scoring = {
             3: 1, 4: 1, 5: 2, 6: 3, 7: 5, 8: 11
         }
+
+        self.child_index, self.child_mask, self.term_score, self.terminal_word = self.make_trie(word_list)
+
+        # Per trie node, the id of the last grid that word was found in (dedupes words without a set per grid)
+        self.seen_gen = array('I', [0]) * len(self.term_score)
+        self._grid_counter = 0
         
         # Official Boggle dice sets (post 1987)
         self.dice = [
@@ -61,172 +154,172 @@ class BoggleEvaluator:
             'DISTTY', 'EEGHNW', 'EEINSU', 'EHRTVW',
             'EIOSST', 'ELRTTY', 'HIMNUQ', 'HLNNRZ'
         ]
+        # Faces stored as letter codes so rolled faces drop straight into a grid
+        self.dice = [bytes(ord(face) - ord('A') for face in die) for die in self.dice]
 
-        self.neighbors_cache = {}
-        for i in range(self.size):
-            for j in range(self.size):
-                self.neighbors_cache[(i, j)] = self.generate_neighbors(i, j)
-        
-    def generate_neighbors(self, row: int, col: int) -> List[Tuple[int, int]]:
-        """Get all valid neighboring positions (including diagonals)"""
+        # Neighbours by flat cell id (row * size + col), walked by the DFS
+        self.neighbors_flat = tuple(
+            self.generate_neighbors(i // self.size, i % self.size)
+            for i in range(self.size * self.size)
+        )
+
+    def generate_neighbors(self, row: int, col: int) -> Tuple[int, ...]:
+        """Get the flat cell ids of all valid neighboring positions (including diagonals)"""
         neighbors = []
         for dr in [-1, 0, 1]:
             for dc in [-1, 0, 1]:
                 nr, nc = row + dr, col + dc
                 if (dr == 0 and dc == 0) or not (0 <= nr < self.size) or not (0 <= nc < self.size):
                     continue
-                neighbors.append((nr, nc))
-        return neighbors
-
-    def get_neighbors(self, row: int, col: int) -> List[Tuple[int, int]]:
-        """Get all valid neighboring positions (cached)"""
-        return self.neighbors_cache[(row, col)]
+                neighbors.append(nr * self.size + nc)
+        return tuple(neighbors)
     
-    def generate_random_grid(self, verbose: bool = False) -> Tuple[List[List[str]], List[str]]:
-        """Generate a random Boggle grid using dice with fixed faces"""
-        dice = self.dice[:]
-        random.shuffle(dice)
-
-        letters = [random.choice(die) for die in dice]
-        grid = [
-            letters[i * self.size:(i + 1) * self.size]
-            for i in range(self.size)
-        ]
+    def generate_random_grid(self, verbose: bool = False) -> Tuple[bytes, List[bytes]]:
+        """Generate a random Boggle grid using dice with fixed faces
+
+        Grids are flat, one byte per cell in row order (letters encoded as 0-25)
+        """
+        dice = random.sample(self.dice, len(self.dice))
+        faces = random.choices(range(6), k=len(dice))
+
+        grid = bytes(die[face] for die, face in zip(dice, faces))
         
         return grid, dice
 
-    def mutate_grid(self, grid, dice) -> Tuple[List[List[str]], List[str]]:
+    def mutate_grid(self, grid: bytes, dice: List[bytes]) -> Tuple[bytes, List[bytes]]:
         """Create a mutated version of the grid"""
-        new_grid = grid.copy()
+        new_grid = bytearray(grid)
         new_dice = dice.copy()
-        size=self.size
+        cells = range(self.size * self.size)
         
         mutation_type = random.choice(['swap', 'reroll', 'swap_and_reroll'])
         
         if mutation_type == 'swap':
-            i1, j1 = random.sample(range(size-1), 2)
-            i2, j2 = random.sample(range(size-1), 2)
-            new_grid[i1][j1], new_grid[i2][j2] = new_grid[i2][j2], new_grid[i1][j1]
-            new_dice[i1*size+j1], new_dice[i2*size+j2] = new_dice[i2*size+j2], new_dice[i1*size+j1]
+            c1, c2 = random.sample(cells, 2)
+            new_grid[c1], new_grid[c2] = new_grid[c2], new_grid[c1]
+            new_dice[c1], new_dice[c2] = new_dice[c2], new_dice[c1]
 
         elif mutation_type == 'reroll':
-            i1, j1 = random.sample(range(size-1), 2)
-            new_grid[i1][j1] = random.choice(new_dice[i1*size+j1])
+            c1 = random.choice(cells)
+            new_grid[c1] = random.choice(new_dice[c1])
         
         elif mutation_type == 'swap_and_reroll':
-            i1, j1 = random.sample(range(size-1), 2)
-            i2, j2 = random.sample(range(size-1), 2)
-            new_grid[i1][j1] = random.choice(new_dice[i1*size+j1])
-            new_grid[i1][j1], new_grid[i2][j2] = new_grid[i2][j2], new_grid[i1][j1]
-            new_dice[i1*size+j1], new_dice[i2*size+j2] = new_dice[i2*size+j2], new_dice[i1*size+j1]
+            c1, c2 = random.sample(cells, 2)
+            new_grid[c1] = random.choice(new_dice[c1])
+            new_grid[c1], new_grid[c2] = new_grid[c2], new_grid[c1]
+            new_dice[c1], new_dice[c2] = new_dice[c2], new_dice[c1]
         
-        return new_grid, new_dice
+        return bytes(new_grid), new_dice
     
-    def optimize_grid(self, generations=1_000, population_size=50) -> Tuple[List[List[str]], int, Dict[str, int]]:
+    def optimize_grid(self, generations=1_000, population_size=50) -> Tuple[bytes, int, Dict[str, int]]:
         """Use genetic algorithm to find optimal grid"""
         # Initialize population with random samples
         population = []
         for _ in range(population_size):
-            population.append(self.generate_random_grid())
+            population.append(Individual(*self.generate_random_grid()))
         
-        self.print_grid(random.choice(population)[0])
+        self.print_grid(random.choice(population).grid)
         print(f"First generation staring")
         
         best_grid = None
         best_score = -1
         best_words = []
         
-        for generation in range(generations):
-            # Score the grids
-            scored_population = []
-            for grid, dice in population:
-                score, formed_words = self.calculate_grid_score(grid)
-                scored_population.append((score, grid, dice, formed_words))
-            
-            # Sort by score
-            scored_population.sort(key=lambda x: x[0], reverse=True)
+        # Reused across generations, refilled with the new individuals' scores each time
+        scores = array('i', [0] * population_size)
+        self._score_cache_limit = 4 * population_size
+
+        workers = os.cpu_count() or 1
+        search_tables = (self.child_index, self.child_mask, self.term_score, self.neighbors_flat)
+        with multiprocessing.Pool(processes=workers, initializer=init_search_worker, initargs=search_tables) as pool:
+            for generation in range(generations):
+                # Score the new grids across the worker pool (dice stay here, only the grids are shipped),
+                # survivors carry their score over from the previous generation
+                dirty = [individual for individual in population if individual.dirty]
+                self.score_population(pool, workers, [individual.grid for individual in dirty], scores)
+                for individual, score in zip(dirty, scores):
+                    individual.score = score
+                    individual.dirty = False
             
-            # Update best
-            if scored_population[0][0] > best_score:
-                best_score = scored_population[0][0]
-                best_grid = scored_population[0][1].copy()
-                best_words = scored_population[0][3].copy()
+                # Update best
+                fittest = max(population, key=lambda x: x.score)
+                if fittest.score > best_score:
+                    best_score = fittest.score
+                    best_grid = fittest.grid
+                    best_words = self.find_words_in_grid(best_grid)
                 
-                if self.verbose:
-                    print(f'\033[9F')
-                    self.print_grid(best_grid)
-                else:                    
-                    print(f'\033[1F')
-                print(f"Generation {generation}: New best {best_score} from {len(best_words)} words")
+                    if self.verbose:
+                        print(f'\033[9F')
+                        self.print_grid(best_grid)
+                    else:                    
+                        print(f'\033[1F')
+                    print(f"Generation {generation}: New best {best_score} from {len(best_words)} words")
             
-            ### Create next generation ###
-            survivors = [(grid, dice) for _, grid, dice, _ in scored_population[:population_size//4]]
-            new_population = survivors.copy()
+                ### Create next generation ###
+                survivors = heapq.nlargest(population_size//4, population, key=lambda x: x.score)
+                new_population = survivors.copy()
             
-            while len(new_population) < population_size:
-                if random.random() < 0.3:  # 30% random
-                    new_population.append(self.generate_random_grid())
-                else:  # 70% mutations
-                    (parent_grid, parent_dice) = random.choice(survivors)
-                    child = self.mutate_grid(parent_grid, parent_dice)
-                    new_population.append(child)
+                while len(new_population) < population_size:
+                    if random.random() < 0.3:  # 30% random
+                        new_population.append(Individual(*self.generate_random_grid()))
+                    else:  # 70% mutations
+                        parent = random.choice(survivors)
+                        child = Individual(*self.mutate_grid(parent.grid, parent.dice))
+                        new_population.append(child)
             
-            population = new_population
+                population = new_population
 
-            if self.verbose and generation % 250 == 0:
-                print(f"\033[1FGeneration {generation}: Best score {best_score} from {len(best_words)} words")
+                if self.verbose and generation % 250 == 0:
+                    print(f"\033[1FGeneration {generation}: Best score {best_score} from {len(best_words)} words")
 
         
         return best_grid, best_score, best_words    
 
-    def dfs(self, grid: List[List[str]], row: int, col: int, path: List[str], node: dict, found_words: Dict[str, int] = {}):
-        """Recursive DFS with trie node"""
-        # Check if current path is a valid word
-        if "_end_" in node and len(path) >= 3:
-            word = ''.join(path)
-            if word not in found_words:
-                found_words[word] = self.scoring.get(len(word), 11)
-
-        # Explore neighbors
-        for nr, nc in self.get_neighbors(row, col):
-            letter = grid[nr][nc]
-            if letter in node:
-                path.append(letter)
-                self.dfs(grid, nr, nc, path, node[letter], found_words)
-                path.pop()
-
-        return found_words
-    
-    def find_words_in_grid(self, grid: List[List[str]]) -> Dict[str, int]:
+    def score_population(self, pool: multiprocessing.pool.Pool, workers: int, grids: List[bytes], scores_out: array):
+        """Score a whole population in one batch per worker, writing the scores into scores_out
+
+        Grids already in the score cache (unchanged survivors, no-op mutations) are not sent to the workers
+        """
+        cache = self._score_cache
+        misses = [grid for grid in dict.fromkeys(grids) if grid not in cache]
+
+        fresh = {}
+        if misses:
+            grids_bytes = b''.join(misses)
+            cells = self.size * self.size
+            batch = -(-len(misses) // workers) * cells
+            batches = [grids_bytes[i:i + batch] for i in range(0, len(grids_bytes), batch)]
+            fresh = dict(zip(misses, itertools.chain.from_iterable(pool.map(score_grids, batches))))
+
+        scores_out[:] = array('i', (fresh[grid] if grid in fresh else cache[grid] for grid in grids))
+
+        cache.update(fresh)
+        while len(cache) > self._score_cache_limit:
+            del cache[next(iter(cache))]
+
+    def find_words_in_grid(self, grid: bytes) -> Dict[str, int]:
         """Find all valid words in the grid using DFS"""
-        found_words = {}
+        self._grid_counter += 1
+        found_nodes = find_word_nodes(grid, self.child_index, self.child_mask, self.term_score, self.neighbors_flat,
+                                      self.seen_gen, self._grid_counter)
         
-        # DFS from each position
-        for i in range(self.size):
-            for j in range(self.size):
-                letter = grid[i][j]
-                node = self.word_trie.get(letter)
-                if node is None:
-                    continue
+        # Words are only spelled out once, from the terminal nodes that were reached
+        return {self.terminal_word[node]: self.term_score[node] for node in found_nodes}
 
-                self.dfs(grid, i, j, [letter], node, found_words)
-        
-        return found_words
-    
-    def calculate_grid_score(self, grid: List[List[str]]) -> Tuple[int, Dict[str, int]]:
+    def calculate_grid_score(self, grid: bytes) -> Tuple[int, Dict[str, int]]:
         """Calculate total score for a grid"""
         found_words = self.find_words_in_grid(grid)
         total_score = sum(found_words.values())
         return total_score, found_words
 
-    def print_grid(self, grid: List[str]):
+    def print_grid(self, grid: bytes):
         """Pretty print a grid"""
         print('+' + '-' * (self.size*2 + 1) + '+')
         for i in range(self.size):
-            print('| ' + ' '.join(grid[i]) + ' |')
+            print('| ' + ' '.join(chr(code + ord('A')) for code in grid[i * self.size:(i + 1) * self.size]) + ' |')
         print('+' + '-' * (self.size*2 + 1) + '+')
     
-    def print_results(self, grid: List[List[str]], score: int, words: Dict[str, int]):
+    def print_results(self, grid: bytes, score: int, words: Dict[str, int]):
         """Print evaluation results"""
         print(f'Grid Score: {score}')
         print(f'Words Found: {len(words)}')
@@ -240,24 +333,39 @@ class BoggleEvaluator:
             for word, word_score in sorted_words:
                 print(f'  {word}: {word_score} points')
 
-    def make_trie(self, words: List[str]) -> dict:
-        """Make a basic trie out of the word list"""
-        trie = dict()
+    def make_trie(self, words: List[str]) -> Tuple[array, array, array, List[str]]:
+        """Make a flat trie out of the word list
+
+        Node 0 is the root, the child of node n for letter code c (0-25) is child_index[n * 26 + c] (-1 if absent),
+        bit c of child_mask[n] is set when that child exists, term_score[n] holds the Boggle score of the word ending at n (0 if no scorable word ends there)
+        and terminal_word[n] that word itself
+
+        The Q die face is really "Qu", so QU is stored as a single Q edge and words with a Q not followed by U are
+        skipped (they can never be formed). Scores still use the full word length
+        """
+        child_index = [-1] * 26
+        child_mask = [0]
+        term_score = [0]
+        terminal_word = ['']
         for word in words:
-            step = trie
-            for letter in word:
-                step = step.setdefault(letter, {})
-            step['_end_'] = '_end_'
-        return trie
-
-    def in_trie(self, path) -> bool:
-        """Check the trie for a given path"""
-        current_dict = self.word_trie
-        for letter in path:
-            if letter not in current_dict:
-                return False
-            current_dict = current_dict[letter]
-        return True
+            if not (word.isascii() and word.isalpha()) or word.count('Q') != word.count('QU'):
+                continue
+            node = 0
+            for letter in word.replace('QU', 'Q'):
+                code = ord(letter) - ord('A')
+                slot = node * 26 + code
+                if child_index[slot] < 0:
+                    child_index[slot] = len(term_score)
+                    child_index.extend([-1] * 26)
+                    child_mask[node] |= 1 << code
+                    child_mask.append(0)
+                    term_score.append(0)
+                    terminal_word.append('')
+                node = child_index[slot]
+            if len(word) >= 3:
+                term_score[node] = self.scoring.get(len(word), 11)
+                terminal_word[node] = word
+        return array('i', child_index), array('i', child_mask), array('i', term_score), terminal_word
 
 # Load the word list out of a file
 def load_word_list(filename: str) -> List[str]:
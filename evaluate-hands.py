@@ -15,7 +15,7 @@ Options:
     --[j]son            Format output in json format (defaults to false)
 
 Analysis process:
-1. Loads word list and converts to letter frequency counters
+1. Loads word list, converts each word to its tile counts and drops words containing another word
 2. Generates all possible 7-tile hands using backtracking algorithm
 3. Checks each hand against word list for valid word formation
 4. Accounts for blank tiles (wildcards) as automatic valid hands (all wild hands have a minimum of one valid two letter word available)
@@ -33,9 +33,8 @@ Note:
   For different games and editions LETTER_TILES and HAND_SIZE need to be adjusted accordingly
 """
 
-import argparse, math, sys, time
-from collections import Counter
-from typing import Dict, List, Union
+import argparse, math, multiprocessing, os, sys, time
+from typing import Dict, List, Set, Tuple, Union
 
 """ --------- variables --------- """
 LETTER_TILES = {
@@ -46,58 +45,189 @@ LETTER_TILES = {
     'Y': 2, 'Z': 1, '?': 2, # ? is wild
 }
 
+# Slot of each tile in a 27 entry count array (index 26 is the wild)
+TILE_SLOTS = {letter: i for i, letter in enumerate('ABCDEFGHIJKLMNOPQRSTUVWXYZ?')}
+WILD_SLOT = TILE_SLOTS['?']
+
+PROGRESS_DEPTH = 4 # stack depth above which count_hands checks whether a progress report is due
+WORD_END = '_end_' # marks a word trie node that completes a word
+
 HAND_SIZE = 7
 TOTAL_HANDS = math.comb(sum(LETTER_TILES.values()), HAND_SIZE)  # 16_007_560_800 for scrabble
 
 """ --------- helpers ---------- """
-def load_word_counters(path: str) -> List[Counter]:
-    """Load words from file and return as list of letter counters."""
+def load_word_counts(path: str) -> List[bytes]:
+    """Load words from file (first word of each line) and return the minimal set as 27 tile counts (see TILE_SLOTS)."""
+    # Lines are counted as they are read, only the distinct count rows are ever held in memory
+    word_counts = set()
     with open(path, encoding="utf-8") as f:
-        words = [w.strip().upper() for w in f]
-    return [Counter(word) for word in words]
+        for line in f:
+            if not line.strip():
+                continue
+            word = line.split()[0].upper()
+            if not (word.isascii() and word.isalpha()) or len(word) > HAND_SIZE:
+                continue
+            counts = bytearray(len(TILE_SLOTS))
+            for letter in word:
+                counts[TILE_SLOTS[letter]] += 1
+            word_counts.add(bytes(counts))
+    return minimise_words(word_counts)
+
+def minimise_words(word_counts: Set[bytes]) -> List[bytes]:
+    """Drop every word whose tiles contain another word's, those can never decide whether a hand is valid."""
+    kept = []
+    for counts in sorted(word_counts, key=lambda counts: (sum(counts), counts)):
+        mask = tile_mask(counts)
+        # shorter words come first, so only the words kept so far can be contained in this one
+        if not any(
+            not (kept_mask & ~mask) and all(have >= need for have, need in zip(counts, kept_counts))
+            for kept_mask, kept_counts in kept
+        ):
+            kept.append((mask, counts))
+    return [counts for _, counts in kept]
+
+def tile_mask(counts: bytes) -> int:
+    """Bitmask of the tiles present in a count array (bit n set when slot n is non-zero)."""
+    return sum(1 << slot for slot, count in enumerate(counts) if count)
+
+def make_word_trie(word_counts: List[bytes]) -> dict:
+    """Make a trie of the words' canonical forms (tiles most widely used first), keyed by tile slot.
 
-def hand_has_word(hand: Counter, word_counters: List[Counter]) -> bool:
-    """Check if hand can form any word from the word list."""
-    return any(not (word_counter - hand) for word_counter in word_counters)
+    Each edge is a [need mask, child node] pair, the need mask holding the tiles every word below the edge uses.
+    """
+    # the need masks already turn a hand away at the first edge when it lacks a tile, whatever the order, so spell
+    # words with the tiles most of them use first: they share long prefixes and a hand has far fewer edges to check
+    order = sorted(range(WILD_SLOT), key=lambda slot: -sum(1 for counts in word_counts if counts[slot]))
+    trie = {}
+    for counts in word_counts:
+        mask = tile_mask(counts)
+        node = trie
+        for slot in (slot for slot in order for _ in range(counts[slot])):
+            edge = node.get(slot)
+            if edge is None:
+                edge = node[slot] = [mask, {}]
+            else:
+                edge[0] &= mask
+            node = edge[1]
+            if WORD_END in node: # a shorter word already covers every hand this one could
+                break
+        else:
+            node.clear() # longer words below this one are redundant
+            node[WORD_END] = True
+    return trie
+
+def hand_has_word(hand: bytearray, hand_mask: int, node: dict, last: int = -1, run: int = 0) -> bool:
+    """Check if hand (holding the tiles in hand_mask) can form any word in the (sub)trie.
+
+    Paths run through the tiles in a fixed order, so the only tiles spent on the way to node are the run of its last
+    slot: last and run say which slot that is and how many of it were taken, and the hand itself is never modified.
+    """
+    for slot, (need, child) in node.items():
+        taken = run + 1 if slot == last else 1
+        # every word below the edge is skipped at once when the hand lacks one of the tiles they all share
+        if hand[slot] >= taken and not (need & ~hand_mask):
+            if WORD_END in child or hand_has_word(hand, hand_mask, child, slot, taken):
+                return True
+    return False
 
 """ --------- analysis --------- """
-def analysis(word_counters: List[Counter], progress_every: int = 10_000) -> dict[str, int]:
-    letters = list(LETTER_TILES.items())
-    fact = [math.factorial(i) for i in range(HAND_SIZE + 1)]
+# Enumeration tables and shared progress counters of an analysis worker, set once per process by init_analysis_worker
+_tables = None
+_progress = None
+
+def init_analysis_worker(tables: tuple, progress: tuple) -> None:
+    """Pool initializer, keeps the enumeration tables and progress counters in the worker process"""
+    global _tables, _progress
+    _tables = tables
+    _progress = progress
+
+def count_hands(first_take: int) -> Dict[str, int]:
+    """Count the hands holding exactly first_take tiles of the first letter (runs inside a pool worker)."""
+    letters, suffix_max, picks, completions, completion_weights, word_trie, progress_every, t0 = _tables
+    shared_hands, shared_dead = _progress
 
     stats = dict(valid=0, valid_w=0, dead=0, dead_w=0, total=0)
-    hands_seen = 0
-    t0 = time.perf_counter()
+    next_report = progress_every
+    synced = dict(hands=0, dead=0)
 
-    def backtrack(idx: int, left: int, cur: Counter, weight: int):
-        nonlocal hands_seen
-        if left == 0:       # finished a 7 tile hand
+    def report_progress():
+        nonlocal next_report
+        hands_seen = stats['total']
+        next_report = (hands_seen // progress_every + 1) * progress_every
+        # add what this worker counted since its last report to the totals of all workers
+        with shared_hands.get_lock():
+            shared_hands.value += hands_seen - synced['hands']
+            shared_dead.value += stats['dead'] - synced['dead']
+            synced.update(hands=hands_seen, dead=stats['dead'])
+            elapsed = time.perf_counter() - t0
+            print(f"\r{shared_hands.value:,} hands checked | {shared_dead.value:,} dead | {elapsed:,.1f}s taken", end='', flush=True)
+
+    # Explicit stack of [idx, left, weight, tile mask, next k, last k] frames, one per tile type bound so far
+    # (the mask holds the tiles taken by the frames below). Each frame owns its letter's slot in the hand,
+    # which holds the k tiles currently taken.
+    cur = bytearray(len(TILE_SLOTS))
+    stack = [[0, HAND_SIZE, 1, 0, first_take, first_take]]
+    while stack:
+        frame = stack[-1]
+        idx, left, weight, mask, k, last = frame
+        slot = letters[idx][0]
+        if k > last:
+            cur[slot] = 0
+            stack.pop()
+            # progress is only looked at as one of the first few letters moves on, never per hand
+            if len(stack) < PROGRESS_DEPTH and progress_every > 1_000 and stats['total'] >= next_report:
+                report_progress()
+            continue
+        frame[4] = k + 1
+
+        cur[slot] = k
+        next_weight = weight * picks[idx][k]
+        next_mask = mask | (1 << slot) if k else mask
+        if k and (slot == WILD_SLOT or hand_has_word(cur, next_mask, word_trie)):
+            # Valid hands stay valid as tiles are added, so every completion of this partial hand is valid:
+            # count them (and their weight, choosing the remaining tiles from letters[idx + 1:]) without enumerating
+            hands = completions[idx + 1][left - k]
+            stats['total'] += hands
+            stats['valid'] += hands
+            stats['valid_w'] += next_weight * completion_weights[idx + 1][left - k]
+        elif k == left:
+            # finished a 7 tile hand, no prefix of it could form a word so it is dead
             stats['total'] += 1
-            hands_seen += 1
-            if cur['?'] or hand_has_word(cur, word_counters):
-                stats['valid'] += 1
-                stats['valid_w'] += weight
-            else:
-                stats['dead'] += 1
-                stats['dead_w'] += weight
-
-            if progress_every > 1_000 and hands_seen % progress_every == 0:
-                elapsed = time.perf_counter() - t0
-                print(f"\r{hands_seen:,} hands checked | {stats['dead']:,} dead | {elapsed:,.1f}s taken", end='')
-            return
-            
-        if idx == len(letters): # ran out of tile types (need to backtrack to where more available letters are)
-            return
-
-        letter, avail = letters[idx]
-        for k in range(min(avail, left) + 1):
-            # number of ways to pick those k tiles from the available copies
-            next_weight = weight * math.comb(avail, k)
-            cur[letter] += k
-            backtrack(idx + 1, left - k, cur, next_weight)
-            cur[letter] -= k
-
-    backtrack(0, HAND_SIZE, Counter(), 1)
+            stats['dead'] += 1
+            stats['dead_w'] += next_weight
+        elif left - k <= suffix_max[idx + 1]: # otherwise not enough tiles left to finish the hand
+            stack.append([idx + 1, left - k, next_weight, next_mask, 0, min(letters[idx + 1][1], left - k)])
+
+    return stats
+
+def analysis(word_counts: List[bytes], progress_every: int = 10_000) -> dict[str, int]:
+    # (slot, available) per tile type: most plentiful tiles are bound first, and a branch is abandoned
+    # as soon as the tiles still to come can no longer fill the hand
+    letters = [(TILE_SLOTS[letter], avail) for letter, avail in sorted(LETTER_TILES.items(), key=lambda item: -item[1])]
+    suffix_max = [sum(avail for _, avail in letters[i:]) for i in range(len(letters) + 1)]
+    word_trie = make_word_trie(word_counts)
+
+    # picks[idx][k]: ways to pick k tiles from the available copies of letters[idx]
+    picks = [[math.comb(avail, k) for k in range(HAND_SIZE + 1)] for _, avail in letters]
+
+    # completions[idx][left]: number of distinct ways to fill the last `left` tiles of a hand from letters[idx:]
+    # and completion_weights[idx][left] the number of tile draws behind them (choosing `left` of the tiles remaining)
+    completion_weights = [[math.comb(remaining, left) for left in range(HAND_SIZE + 1)] for remaining in suffix_max]
+    completions = [[0] * (HAND_SIZE + 1) for _ in range(len(letters) + 1)]
+    completions[len(letters)][0] = 1
+    for idx in range(len(letters) - 1, -1, -1):
+        avail = letters[idx][1]
+        for left in range(HAND_SIZE + 1):
+            completions[idx][left] = sum(completions[idx + 1][left - k] for k in range(min(avail, left) + 1))
+
+    # Each count of the first letter is an independent subtree, fanned out over the worker pool
+    tables = (letters, suffix_max, picks, completions, completion_weights, word_trie, progress_every, time.perf_counter())
+    progress = (multiprocessing.Value('q', 0), multiprocessing.Value('q', 0))
+    stats = dict(valid=0, valid_w=0, dead=0, dead_w=0, total=0)
+    with multiprocessing.Pool(processes=os.cpu_count(), initializer=init_analysis_worker, initargs=(tables, progress)) as pool:
+        for subtree_stats in pool.imap_unordered(count_hands, range(min(letters[0][1], HAND_SIZE) + 1)):
+            for key, value in subtree_stats.items():
+                stats[key] += value
     return stats
 
 """ ----------- main ----------- """
@@ -108,10 +238,10 @@ def main() -> None:
     parser.add_argument('--json', '-j', action='store_true', help='Output results in json format')
     args = parser.parse_args()
     
-    word_counters = load_word_counters(args.wordfile)
-    print(f"Loaded {len(word_counters)} valid words", file = sys.stderr)
+    word_counts = load_word_counts(args.wordfile)
+    print(f"Loaded {len(word_counts)} valid words", file = sys.stderr)
     
-    stats = analysis(word_counters, args.report_every)
+    stats = analysis(word_counts, args.report_every)
     
     if args.json:
         json_output = f'''{{
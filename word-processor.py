@@ -41,6 +41,9 @@ class ScrabbleProcessor:
         'V':  2, 'W': 2, 'X': 1, 'Y': 2, 'Z': 1
     }
     
+    # Slot of each letter in a letter count array
+    LETTER_SLOTS = {letter: i for i, letter in enumerate(TILE_COUNTS)}
+    
     def __init__(self, exclude_letters: Set[str] = None, include_letters: Set[str] = None,
                  min_length: int = 1, max_length: int = None, verbose: bool = False):
         """Initialize processor with filtering options."""
@@ -50,6 +53,19 @@ class ScrabbleProcessor:
         self.max_length = max_length
         self.verbose = verbose
         
+        # Letter rules as bitmasks (each character of an argument counts as its own letter)
+        self._exclude_mask = self.letter_mask(''.join(self.exclude_letters).upper())
+        self._include_mask = self.letter_mask(''.join(self.include_letters).upper())
+        
+    def letter_mask(self, letters: str) -> int:
+        """Bitmask of the tile letters in a string (bit n set for the letter in slot n)."""
+        mask = 0
+        for letter in letters:
+            slot = self.LETTER_SLOTS.get(letter)
+            if slot is not None:
+                mask |= 1 << slot
+        return mask
+        
     def is_valid_word(self, word: str) -> bool:
         """Check if word meets length and letter requirements."""
         if len(word) < self.min_length:
@@ -57,14 +73,14 @@ class ScrabbleProcessor:
         if self.max_length and len(word) > self.max_length:
             return False
         
-        word_upper = word.upper()
+        word_mask = self.letter_mask(word.upper())
         
         # Check exclusion rules
-        if any(letter in word_upper for letter in self.exclude_letters):
+        if word_mask & self._exclude_mask:
             return False
             
         # Check inclusion rules (if any specified)
-        if self.include_letters and not any(letter in word_upper for letter in self.include_letters):
+        if self.include_letters and not word_mask & self._include_mask:
             return False
             
         return True
@@ -108,25 +124,35 @@ class ScrabbleProcessor:
             
         return canonical_words
     
+    def letter_counts(self, word: str) -> bytes:
+        """Count the letters of a word into one slot per tile letter (any other letter shares the last slot)."""
+        counts = bytearray(len(self.LETTER_SLOTS) + 1)
+        for letter in word:
+            counts[self.LETTER_SLOTS.get(letter, len(self.LETTER_SLOTS))] += 1
+        return bytes(counts)
+    
     def remove_supersets(self, canonical_words: List[str]) -> List[str]:
         """Remove words that are supersets of other words."""
         # Sort by length for efficient superset checking
         sorted_words = sorted(canonical_words, key=len)
-        counters = [Counter(word) for word in sorted_words]
+        minimal = []  # (letter mask, letter counts) of every word that is not a superset so far
         filtered_words = []
         
-        for i, (word, word_counter) in enumerate(zip(sorted_words, counters)):
-            is_superset = False
+        for word in sorted_words:
+            word_counts = self.letter_counts(word)
+            word_mask = sum(1 << slot for slot, count in enumerate(word_counts) if count)
             
-            # Check if current word is a superset of any previous word
-            for j in range(i):
-                other_counter = counters[j]
-                if all(word_counter[letter] >= count for letter, count in other_counter.items()):
-                    is_superset = True
-                    break
+            # Check if current word is a superset of any previous word; supersets are transitive, so only the
+            # minimal words need checking, and a word missing one of their letters is skipped on its mask alone
+            is_superset = any(
+                not (other_mask & ~word_mask) and all(have >= need for have, need in zip(word_counts, other_counts))
+                for other_mask, other_counts in minimal
+            )
             
-            if not is_superset and self.is_scrabble_valid(word):
-                filtered_words.append(word)
+            if not is_superset:
+                minimal.append((word_mask, word_counts))
+                if self.is_scrabble_valid(word):
+                    filtered_words.append(word)
                 
         return filtered_words
     
@@ -149,8 +175,8 @@ class ScrabbleProcessor:
             output_path = Path(output_file)
             output_path.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(sorted(filtered_words)) + '\n')
+            with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.writelines(word + '\n' for word in sorted(filtered_words))
                 
         except Exception as e:
             print(f"Error writing output file: {e}", file=sys.stderr)